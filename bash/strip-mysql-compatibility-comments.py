@@ -22,8 +22,10 @@ Everything else is written as-is, including regular code comments:
     # another comment
 
 The script never loads the whole file into memory.
-It reads line by line and only keeps one versioned comment block
-in memory at a time.
+It memory-maps the dump (or, where that is not possible, reads it in large
+binary chunks) and processes it a few megabytes of complete lines at a time;
+even very long versioned comment blocks (e.g. trigger bodies) are streamed
+through without being collected.
 
 Optionally, if a table metadata TSV is provided, it will also
 normalize CREATE TABLE statements to include ENGINE, ROW_FORMAT,
@@ -36,69 +38,265 @@ the very top of the output dump:     USE `your_db_name`;
 
 Optionally strip DROP* statements when --no_drop option used.
 
+Optionally process a large dump on several processes with --jobs N
+(not combined with the table metadata TSV).
+
+Optionally, on Linux, read and write through io_uring with --io-uring
+(requires the 'liburing' Python package) to overlap disk I/O with processing.
+On any platform, --async-io does the same with background I/O threads.
+Both read the dump through their own buffers, so they bypass the memory-mapped
+scan and the os.sendfile() copy of unchanged ranges: on a local disk they are
+not expected to be faster than the default.
+
+Optionally compile this script ahead of time with mypyc (pip install mypy)
+for faster processing. The types are given in type comments, so the same
+script still runs on older Python 3 versions. In the directory of this script run:
+
+    cp strip-mysql-compatibility-comments.py strip_mysql_compatibility_comments.py
+    mypyc --ignore-missing-imports strip_mysql_compatibility_comments.py
+    rm -r strip_mysql_compatibility_comments.py build
+
+The script then runs the compiled module (strip_mysql_compatibility_comments.*.so,
+or .pyd on Windows) instead of itself. A build older than the script is not used:
+rebuild it after updating the script, or delete it.
+
 Usage:
-    python strip-mysql-compatibility-comments.py [--no-drop] [--db-name DB_NAME] input.sql output.sql [tables-meta.tsv]
+    python strip-mysql-compatibility-comments.py [--no-drop] [--db-name DB_NAME] [--jobs N] [--io-uring] [--async-io] input.sql output.sql [tables-meta.tsv]
 """
 
+import collections
+import concurrent.futures
+import contextlib
+import importlib.machinery
+import importlib.util
+import mmap
 import os
 import re
+import shutil
 import sys
+import tempfile
 import argparse
 
+try:
+    # Only used by the type comments (checked by mypy, and by the mypyc build).
+    from typing import Tuple, Optional, Dict, Any, Callable, Deque, Iterator, List, Union
+except ImportError:
+    pass
 
-def find_conditional_end(comment):
-    """
-    Given a string that starts with a versioned comment:
+try:
+    # Optional: overlapped reads/writes through Linux io_uring (--io-uring).
+    import liburing
+except ImportError:
+    liburing = None
 
-        /*!<digits>...
 
-    find the index of the closing "*/" that terminates THIS comment,
-    correctly handling nested regular block comments "/* ... */" inside.
+# Start of a versioned compatibility comment: "/*!" followed by the version digits.
+# A bare "/*!" without digits is not a versioned comment and is left as-is.
+VERSIONED_COMMENT_RE = re.compile(rb'/\*![0-9]+')
 
-    Returns:
-        (end_pos, digits_end)
+# Delimiters of the regular block comments nested inside a versioned one.
+# Matches are taken left to right without overlap, so "/*/" is an opener only.
+COMMENT_DELIMITER_RE = re.compile(rb'/\*|\*/')
+
+# Buffered I/O sizes. The dump is processed as bytes, never decoded as a whole.
+# Output is already written in pieces of about READ_CHUNK_SIZE (one per line
+# range, see strip_versioned_comments), so the output buffer only has to batch
+# the few small writes, like the header.
+READ_CHUNK_SIZE = 4 << 20
+IO_BUFFER_SIZE = 8 << 20
 
-        end_pos    - index where the closing "*/" starts (or None if not found)
-        digits_end - index right after the version digits (i.e. start of inner content)
-    """
-    n = len(comment)
-    # comment[0:3] should be "/*!"
-    j = 3
-    while j < n and comment[j].isdigit():
-        j += 1
-    digits_end = j
-    version_str = comment[3:digits_end]
-    if not version_str:
-        return None, None
 
-    depth = 0
-    k = digits_end
-    end_pos = None
+def find_comment_close(buf, start, end, depth=0):
+    # type: (Any, int, int, int) -> Tuple[Optional[int], int]
+    """
+    Scan the body of a versioned comment in buf[start:end], where 'depth' is
+    the number of nested regular block comments "/* ... */" already open at
+    'start' (0 at the beginning of the body).
 
-    while k < n - 1:
-        two = comment[k:k + 2]
+    Returns:
+        (end_pos, depth)
 
-        if two == "/*":
+        end_pos - index in buf where the closing "*/" of the versioned comment
+                  starts, or None if it is not within buf[start:end]
+        depth   - nesting depth reached, to resume the scan in the next chunk
+    """
+    # The regex engine skips the text between delimiters in C; Python code
+    # only runs once per "/*" or "*/".
+    for m in COMMENT_DELIMITER_RE.finditer(buf, start, end):
+        if buf[m.start()] == 0x2F:    # "/*"
             # nested regular block comment
             depth += 1
-            k += 2
-            continue
+        elif depth == 0:
+            return m.start(), depth
+        else:
+            depth -= 1
 
-        if two == "*/":
-            if depth == 0:
-                end_pos = k
+    return None, depth
+
+
+def new_comment_state():
+    # type: () -> Dict[str, Any]
+    """Initial state for strip_versioned_comments(): outside of any comment."""
+    return {
+        "in_comment": False,
+        "depth": 0,
+        "unwrap": False,
+        "pending": [],
+    }
+
+
+def strip_versioned_comments(buf, pos, limit, state, version_threshold, write):
+    # type: (Any, int, int, Dict[str, Any], int, Callable[[bytes], None]) -> None
+    """
+    Unwrap or keep the versioned comments in buf[pos:limit] and pass the
+    result to write() in one piece. 'limit' must be at a line boundary (or
+    at EOF), so that write() always sees whole lines. 'buf' may be bytes or
+    an mmap.
+
+    A versioned comment which is not closed by 'limit' is written out as far
+    as it goes; 'state' (see new_comment_state) carries it over to the next
+    call, so the comment is never collected in memory:
+
+        in_comment - inside a versioned comment
+        depth      - nested '/* ... */' comments open inside it
+        unwrap     - whether its wrapper is dropped (version < threshold)
+        pending    - pieces of the unterminated last line (feed_versioned_comments only)
+    """
+    in_comment = state["in_comment"]
+    depth = state["depth"]
+    unwrap = state["unwrap"]
+
+    # Versions are compared as digit strings, without int(): a shorter
+    # version is lower than the threshold, a longer one is higher, and
+    # versions of the same length compare like the strings.
+    threshold = str(version_threshold).encode("ascii")
+    threshold_len = len(threshold)
+
+    # The output is built in one contiguous buffer, extended once per span
+    # between comment delimiters, and written once.
+    out = bytearray()
+
+    while True:
+        if in_comment:
+            # Continue the versioned comment from the previous chunk
+            end_pos, depth = find_comment_close(buf, pos, limit, depth)
+        else:
+            m = VERSIONED_COMMENT_RE.search(buf, pos, limit)
+            if m is None:
+                # No more versioned comments in the complete lines
+                out += buf[pos:limit]
                 break
+
+            # We have '/*!<digits>' starting at idx; m.end() is right after the digits.
+            # Write everything before the comment.
+            idx = m.start()
+            digits_end = m.end()
+            out += buf[pos:idx]
+
+            end_pos, depth = find_comment_close(buf, digits_end, limit)
+
+            # Decide whether to unwrap or keep the comment. This is known
+            # from the opener, so the rest can be streamed through.
+            version_len = digits_end - idx - 3
+            if version_len == threshold_len:
+                unwrap = buf[idx + 3:digits_end] < threshold
+            elif buf[idx + 3] == 0x30:
+                # Leading zeros: the length says nothing
+                unwrap = int(buf[idx + 3:digits_end]) < version_threshold
             else:
-                depth -= 1
-                k += 2
-                continue
+                unwrap = version_len < threshold_len
+            # Unwrap: emit only the inner content.
+            # Keep: emit the whole comment block as-is.
+            pos = digits_end if unwrap else idx
+
+        if end_pos is None:
+            # Comment not closed yet: emit what we have, continue in the next chunk
+            out += buf[pos:limit]
+            in_comment = True
+            break
+
+        out += buf[pos:end_pos] if unwrap else buf[pos:end_pos + 2]
+        in_comment = False
+
+        # Now we continue processing what follows after '*/' (could be ';;' etc.)
+        pos = end_pos + 2
 
-        k += 1
+    state["in_comment"] = in_comment
+    state["depth"] = depth
+    state["unwrap"] = unwrap
 
-    return end_pos, digits_end
+    write(bytes(out))
+
+
+def iter_line_ranges(buf, start, end, chunk_size):
+    # type: (Any, int, int, int) -> Iterator[Tuple[int, int]]
+    """
+    Split buf[start:end] into ranges of about chunk_size bytes, each ending
+    at a line boundary (or at 'end'), for strip_versioned_comments.
+    Yields (range_start, range_end).
+    """
+    while start < end:
+        stop = start + chunk_size
+        if stop >= end:
+            stop = end
+        else:
+            # Stop after the last complete line; a longer line is taken as a whole.
+            stop = (buf.rfind(b"\n", start, stop) + 1) or (buf.find(b"\n", stop, end) + 1) or end
+        yield start, stop
+        start = stop
+
+
+def feed_versioned_comments(
+    state,
+    chunk,
+    version_threshold,
+    write,
+):
+    # type: (Dict[str, Any], bytes, int, Callable[[bytes], None]) -> None
+    """
+    Streaming interface to strip_versioned_comments() for input read in
+    chunks of any size: process the complete lines of 'chunk' and keep the
+    unterminated last line in state["pending"] for the next call.
+    Call finish_versioned_comments() at EOF.
+
+    Only the new chunk is searched for a line end. The pieces of a line
+    longer than a chunk are collected in a list and joined once, when its
+    end arrives, so a long line is not copied and rescanned for every chunk.
+    """
+    pending = state["pending"]
+    limit = chunk.rfind(b"\n") + 1
+    if not limit:
+        # Still inside the same line
+        pending.append(chunk)
+        return
+
+    if pending:
+        pending.append(chunk)
+        buf = b"".join(pending)
+        limit += len(buf) - len(chunk)
+        del pending[:]
+    else:
+        buf = chunk
+
+    strip_versioned_comments(buf, 0, limit, state, version_threshold, write)
+    if limit < len(buf):
+        pending.append(buf[limit:])
+
+
+def finish_versioned_comments(
+    state,
+    version_threshold,
+    write,
+):
+    # type: (Dict[str, Any], int, Callable[[bytes], None]) -> None
+    """Process what feed_versioned_comments() has left at EOF."""
+    buf = b"".join(state["pending"])
+    state["pending"] = []
+    strip_versioned_comments(buf, 0, len(buf), state, version_threshold, write)
 
 
 def report_progress(processed_bytes, total_size, last):
+    # type: (int, int, float) -> float
     """
     Print progress to stderr on a single line using carriage return.
     Returns the updated 'last' value.
@@ -120,6 +318,7 @@ def report_progress(processed_bytes, total_size, last):
 
 
 def load_table_metadata(tsv_path):
+    # type: (str) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]
     """
     Load table metadata from TSV file produced by a query like:
 
@@ -140,7 +339,7 @@ def load_table_metadata(tsv_path):
         default_schema: if all rows share the same TABLE_SCHEMA,
                         this schema name is returned, otherwise None.
     """
-    meta = {}
+    meta = {}  # type: Dict[str, Dict[str, Any]]
     schemas = set()
 
     if not os.path.isfile(tsv_path):
@@ -167,19 +366,19 @@ def load_table_metadata(tsv_path):
             key = "{0}.{1}".format(schema, table)
 
             # Normalize engine
-            eng = (engine or "").strip()
+            eng = (engine or "").strip()  # type: Optional[str]
             if not eng or eng.upper() == "NULL":
                 eng = None
 
             # Normalize row_format
-            rf = (row_format or "").strip()
+            rf = (row_format or "").strip()  # type: Optional[str]
             if not rf or rf.upper() == "NULL":
                 rf = None
             else:
                 rf = rf.upper()
 
             # Normalize collation
-            tc = (table_collation or "").strip()
+            tc = (table_collation or "").strip()  # type: Optional[str]
             if not tc or tc.upper() == "NULL":
                 tc = None
 
@@ -214,19 +413,22 @@ DROP_VIEW_RE = re.compile(
 )
 
 # Generic detection of DROP* statements for optional stripping.
-# Matches lines that begin (ignoring leading whitespace) with DROP ...;
-# and a special case for versioned comments like "/*!50001 DROP ... */".
-DROP_STMT_RE = re.compile(r'^\s*DROP\b', re.IGNORECASE)
-VERSIONED_DROP_STMT_RE = re.compile(r'^\s*/\*![0-9]+\s*DROP\b', re.IGNORECASE)
+# Matches whole lines (with their line ending) that begin (ignoring leading
+# whitespace) with DROP ...; and a special case for versioned comments
+# like "/*!50001 DROP ... */".
+DROP_LINE_RE = re.compile(
+    rb'(?im)^[ \t\v\f]*(?:/\*![0-9]+[ \t\v\f]*)?DROP\b[^\n]*\n?'
+)
 
 # Normalize "SET time_zone = 'UTC';" to "SET time_zone = '+00:00';"
 # Handles arbitrary spaces and one or more semicolons at the end of the line.
 TIME_ZONE_UTC_RE = re.compile(
-    r'(?im)^(\s*SET\s+time_zone\s*=\s*)([\'"])UTC\2(.*)$'
+    rb'(?im)^(\s*SET\s+time_zone\s*=\s*)([\'"])UTC\2(.*)$'
 )
 
 
 def replace_utc_time_zone(text):
+    # type: (bytes) -> bytes
     """
     Replace any standalone "SET time_zone = 'UTC';" statement (with arbitrary
     spacing and one or more semicolons) with "SET time_zone = '+00:00';".
@@ -234,10 +436,35 @@ def replace_utc_time_zone(text):
     This is done in a multiline-safe manner and should not affect data payloads,
     because the pattern is anchored to the beginning of the line.
     """
-    return TIME_ZONE_UTC_RE.sub(r"\1'+00:00'\3", text)
+    return TIME_ZONE_UTC_RE.sub(rb"\1'+00:00'\3", text)
+
+
+def strip_drop_statements(text):
+    # type: (bytes) -> bytes
+    """
+    Remove every line whose first non-whitespace token is DROP, including
+    versioned comments like "/*!50001 DROP VIEW ... */".
+
+    A single regex substitution skips from one DROP line to the next in C,
+    copying the untouched text in between in one piece.
+    """
+    return DROP_LINE_RE.sub(b"", text)
+
+
+def normalize_output(chunk, no_drop):
+    # type: (bytes, bool) -> bytes
+    """
+    Final processing of the output: normalize SET time_zone = 'UTC' to
+    SET time_zone = '+00:00' and, if requested, strip DROP* statements.
+    """
+    chunk = replace_utc_time_zone(chunk)
+    if no_drop:
+        chunk = strip_drop_statements(chunk)
+    return chunk
 
 
 def enhance_create_table(text, state, table_meta, default_schema):
+    # type: (str, Dict[str, Any], Dict[str, Dict[str, Any]], Optional[str]) -> str
     """
     Enhance CREATE TABLE statements in the given text chunk using table_meta.
 
@@ -265,6 +492,7 @@ def enhance_create_table(text, state, table_meta, default_schema):
         skip_for_table = set()
 
     def append_chunk(s):
+        # type: (str) -> None
         out_lines.append(s)
 
     for line in text.splitlines(keepends=True):
@@ -308,7 +536,7 @@ def enhance_create_table(text, state, table_meta, default_schema):
                 # Resolve metadata key (schema.table)
                 schema_to_use = current_schema or default_schema
                 if schema_to_use:
-                    key = "{0}.{1}".format(schema_to_use, current_table)
+                    key = "{0}.{1}".format(schema_to_use, current_table)  # type: Optional[str]
                 else:
                     # No schema info: try by table name uniqueness
                     matches = [
@@ -422,9 +650,604 @@ def enhance_create_table(text, state, table_meta, default_schema):
     return "".join(out_lines)
 
 
+# --- Overlapped I/O through Linux io_uring (optional) -------------------------
+
+
+class UringStream(object):
+    """
+    Read the input dump and write the output dump through io_uring, using the
+    optional 'liburing' package. Up to READ_SLOTS chunks of the input are read
+    ahead into registered (fixed) buffers and up to WRITE_SLOTS output chunks
+    are written in the background, so the disk keeps working while the dump
+    is being processed.
+
+    Provides the small subset of the file API used by process_dump_stream():
+    read() returns the next chunk of the input (b"" at EOF), tell() the input
+    offset reached so far, write() queues output bytes.
+    """
+
+    READ_SLOTS = 8
+    WRITE_SLOTS = 4
+    QUEUE_DEPTH = 32
+    WRITE_ID_BASE = 1 << 32
+
+    def __init__(self, in_path, out_path, chunk_size):
+        # type: (str, str, int) -> None
+        self.chunk_size = chunk_size
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(self.QUEUE_DEPTH, self.ring)
+        self.in_fd = -1
+        self.out_fd = -1
+        self.closed = False
+        try:
+            self.in_fd = os.open(in_path, os.O_RDONLY)
+            self.out_fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            self.in_size = os.fstat(self.in_fd).st_size
+
+            self.read_bufs = [bytearray(chunk_size) for _ in range(self.READ_SLOTS)]
+            # Keep a reference to the iovec array while the buffers are registered.
+            self.read_iov = liburing.Iovec(self.read_bufs)
+            liburing.io_uring_register_buffers(self.ring, self.read_iov)
+        except Exception:
+            self._release()
+            raise
+
+        self.next_read_offset = 0
+        self.position = 0                  # input bytes returned by read() so far
+        self.reads = collections.deque()  # type: Deque[Tuple[int, int, int]]  # (slot, offset, length) in file order
+        self.read_results = {}  # type: Dict[int, int]  # slot -> bytes read, for completed reads
+
+        self.out_buffer = bytearray()
+        self.next_write_offset = 0
+        self.next_write_id = self.WRITE_ID_BASE
+        self.writes = {}  # type: Dict[int, Tuple[bytes, int]]  # write id -> (data, offset), in flight
+
+        for slot in range(self.READ_SLOTS):
+            self._submit_read(slot)
+        liburing.io_uring_submit(self.ring)
+
+    def _submit_read(self, slot):
+        # type: (int) -> None
+        if self.next_read_offset >= self.in_size:
+            return
+        offset = self.next_read_offset
+        length = min(self.chunk_size, self.in_size - offset)
+        self.next_read_offset += length
+
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_read_fixed(sqe, self.in_fd, self.read_bufs[slot], slot, offset)
+        liburing.io_uring_sqe_set_data64(sqe, slot)
+        self.reads.append((slot, offset, length))
+
+    def _submit_write(self, data, offset):
+        # type: (bytes, int) -> None
+        while len(self.writes) >= self.WRITE_SLOTS:
+            self._reap()
+
+        write_id = self.next_write_id
+        self.next_write_id += 1
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_write(sqe, self.out_fd, data, offset)
+        liburing.io_uring_sqe_set_data64(sqe, write_id)
+        # 'data' must stay alive until the write completes.
+        self.writes[write_id] = (data, offset)
+        liburing.io_uring_submit(self.ring)
+
+    def _reap(self):
+        # type: () -> None
+        """Wait for one completion and account for it."""
+        liburing.io_uring_wait_cqe(self.ring, self.cqe)
+        cqe = self.cqe[0]
+        res = cqe.res
+        user_data = cqe.user_data
+        liburing.io_uring_cqe_seen(self.ring, cqe)
+
+        if res < 0:
+            raise OSError(-res, os.strerror(-res))
+
+        if user_data < self.WRITE_ID_BASE:
+            self.read_results[user_data] = res
+            return
+
+        data, offset = self.writes.pop(user_data)
+        if res < len(data):
+            # Short write: queue the rest of it again.
+            self._submit_write(data[res:], offset + res)
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """Return the next chunk of the input in file order ('size' is ignored)."""
+        if not self.reads:
+            return b""
+
+        slot, offset, length = self.reads[0]
+        while slot not in self.read_results:
+            self._reap()
+        self.reads.popleft()
+        res = self.read_results.pop(slot)
+
+        data = bytes(memoryview(self.read_bufs[slot])[:res])
+        if res < length:
+            # Short read: fetch the rest synchronously.
+            data += os.pread(self.in_fd, length - res, offset + res)
+
+        # The slot is free again: read ahead the next chunk into it.
+        self._submit_read(slot)
+        liburing.io_uring_submit(self.ring)
+        self.position += len(data)
+        return data
+
+    def tell(self):
+        # type: () -> int
+        """Return the input offset, like the tell() of a regular file."""
+        return self.position
+
+    def write(self, data):
+        # type: (bytes) -> None
+        """Queue output bytes; they are written in chunk_size pieces."""
+        self.out_buffer += data
+        if len(self.out_buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        # type: () -> None
+        if not self.out_buffer:
+            return
+        data = bytes(self.out_buffer)
+        self.out_buffer = bytearray()
+        self._submit_write(data, self.next_write_offset)
+        self.next_write_offset += len(data)
+
+    def close(self):
+        # type: () -> None
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.flush()
+            # Wait for everything in flight, including unused read-ahead.
+            while self.writes or len(self.read_results) < len(self.reads):
+                self._reap()
+            liburing.io_uring_unregister_buffers(self.ring)
+        finally:
+            self._release()
+
+    def _release(self):
+        # type: () -> None
+        liburing.io_uring_queue_exit(self.ring)
+        for fd in (self.in_fd, self.out_fd):
+            if fd >= 0:
+                os.close(fd)
+
+    def __enter__(self):
+        # type: () -> 'UringStream'
+        return self
+
+    def __exit__(self, *exc_info):
+        # type: (*Any) -> None
+        self.close()
+
+
+# --- Overlapped I/O through background threads (any platform) -----------------
+
+
+class ThreadedStream(object):
+    """
+    Read the input dump and write the output dump on two background threads,
+    for platforms without io_uring. Up to READ_AHEAD chunks of the input are
+    read ahead and up to WRITE_BEHIND output chunks are written behind while
+    the dump is being processed; file I/O releases the GIL, so the disk keeps
+    working in the meantime.
+
+    Provides the same subset of the file API as UringStream.
+    """
+
+    READ_AHEAD = 4
+    WRITE_BEHIND = 4
+
+    def __init__(self, in_path, out_path, chunk_size):
+        # type: (str, str, int) -> None
+        self.chunk_size = chunk_size
+        self.fin = open(in_path, "rb")
+        try:
+            self.fout = open(out_path, "wb")
+        except OSError:
+            self.fin.close()
+            raise
+        self.closed = False
+
+        # One thread each: reads and writes complete in file order.
+        self.reader = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        self.position = 0                  # input bytes returned by read() so far
+        self.reads = collections.deque()  # type: Deque[Any]  # read-ahead futures, in file order
+        self.out_buffer = bytearray()
+        self.writes = collections.deque()  # type: Deque[Any]  # write futures, in file order
+
+        for _ in range(self.READ_AHEAD):
+            self.reads.append(self.reader.submit(self.fin.read, chunk_size))
+
+    def read(self, size=-1):
+        # type: (int) -> bytes
+        """Return the next chunk of the input in file order ('size' is ignored)."""
+        if not self.reads:
+            return b""
+
+        data = self.reads.popleft().result()
+        if data:
+            self.reads.append(self.reader.submit(self.fin.read, self.chunk_size))
+        self.position += len(data)
+        return data
+
+    def tell(self):
+        # type: () -> int
+        """Return the input offset, like the tell() of a regular file."""
+        return self.position
+
+    def write(self, data):
+        # type: (bytes) -> None
+        """Queue output bytes; they are written in chunk_size pieces."""
+        self.out_buffer += data
+        if len(self.out_buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        # type: () -> None
+        if not self.out_buffer:
+            return
+        while len(self.writes) >= self.WRITE_BEHIND:
+            self.writes.popleft().result()
+        data = bytes(self.out_buffer)
+        self.out_buffer = bytearray()
+        self.writes.append(self.writer.submit(self.fout.write, data))
+
+    def close(self):
+        # type: () -> None
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.flush()
+            # Report the first failed write, if any.
+            while self.writes:
+                self.writes.popleft().result()
+        finally:
+            self.reader.shutdown(wait=True)
+            self.writer.shutdown(wait=True)
+            self.fin.close()
+            self.fout.close()
+
+    def __enter__(self):
+        # type: () -> 'ThreadedStream'
+        return self
+
+    def __exit__(self, *exc_info):
+        # type: (*Any) -> None
+        self.close()
+
+
+# --- Opening the dump files ---------------------------------------------------
+
+
+@contextlib.contextmanager
+def open_dump_files(in_path, out_path, io_uring=False, async_io=False):
+    # type: (str, str, bool, bool) -> Iterator[Tuple[Any, Any]]
+    """
+    Open the input dump for reading and the output dump for writing.
+
+    Yields (fin, fout). With io_uring=True both are the same UringStream;
+    if io_uring is not available (non-Linux, 'liburing' not installed, or the
+    kernel refuses to set up a ring) a warning is printed and regular
+    buffered binary files are used instead. With async_io=True (or as the
+    fallback for io_uring, if both are given) both are the same ThreadedStream.
+    """
+    stream = None  # type: Optional[Union[UringStream, ThreadedStream]]
+    if io_uring:
+        if not sys.platform.startswith("linux"):
+            reason = "io_uring is only available on Linux"
+        elif liburing is None:
+            reason = "the 'liburing' package is not installed"
+        else:
+            reason = None
+            try:
+                stream = UringStream(in_path, out_path, READ_CHUNK_SIZE)
+            except (OSError, RuntimeError) as e:
+                reason = str(e)
+        if stream is None:
+            sys.stderr.write(
+                "[WARN] Cannot use io_uring ({0}); "
+                "falling back to {1}.\n".format(
+                    reason, "background-thread I/O" if async_io else "buffered I/O"
+                )
+            )
+
+    if stream is None and async_io:
+        stream = ThreadedStream(in_path, out_path, READ_CHUNK_SIZE)
+
+    if stream is not None:
+        with stream:
+            yield stream, stream
+        return
+
+    with open(in_path, "rb", buffering=IO_BUFFER_SIZE) as fin, \
+         open(out_path, "wb", buffering=IO_BUFFER_SIZE) as fout:
+        yield fin, fout
+
+
+def map_input(fin):
+    # type: (Any) -> Optional[mmap.mmap]
+    """
+    Memory-map the input dump read-only, so that it can be scanned in place:
+    the kernel pages it in on demand and there is no read buffer to fill and
+    concatenate. Returns None if 'fin' cannot be mapped (io_uring or
+    threaded stream, empty file, pipe); it is then read in chunks.
+    """
+    if isinstance(fin, (UringStream, ThreadedStream)):
+        return None
+    try:
+        return mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+# --- Copying unchanged ranges with sendfile -----------------------------------
+
+# os.sendfile() copies between regular files on Linux only; elsewhere the
+# output has to be a socket.
+SENDFILE_FILES = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+
+def is_unchanged_range(buf, start, end, no_drop):
+    # type: (Any, int, int, bool) -> bool
+    """
+    True if buf[start:end] (which must not start inside a versioned comment)
+    comes out of processing exactly as it is: no versioned comments, no
+    UTC time_zone to normalize and, with no_drop, no DROP* lines. CREATE TABLE
+    enhancement is not taken into account.
+
+    Large runs of INSERT data are like this, and can be copied as a whole.
+    """
+    if VERSIONED_COMMENT_RE.search(buf, start, end) is not None:
+        return False
+    if TIME_ZONE_UTC_RE.search(buf, start, end) is not None:
+        return False
+    return not (no_drop and DROP_LINE_RE.search(buf, start, end) is not None)
+
+
+def send_range(fout, in_fd, offset, count):
+    # type: (Any, int, int, int) -> None
+    """
+    Append bytes [offset, offset + count) of the input file in_fd to fout
+    with os.sendfile(): the kernel copies them without passing them through
+    Python. Only for SENDFILE_FILES platforms.
+
+    Raises OSError if the input ends before offset + count, rather than
+    leaving the output dump silently short.
+    """
+    # Whatever fout has buffered goes first.
+    fout.flush()
+    end = offset + count
+    while offset < end:
+        sent = os.sendfile(fout.fileno(), in_fd, offset, end - offset)
+        if sent == 0:
+            raise OSError(
+                "Short copy: the input file ended at byte {0:,}, {1:,} bytes "
+                "before the expected end (was it truncated while being read?)".format(
+                    offset, end - offset
+                )
+            )
+        offset += sent
+
+
+def strip_mapped_dump(
+    mm,
+    in_fd,
+    start,
+    end,
+    state,
+    version_threshold,
+    no_drop,
+    write,
+    fout=None,
+):
+    # type: (Any, int, int, int, Dict[str, Any], int, bool, Callable[[bytes], None], Any) -> Iterator[int]
+    """
+    Whole-file interface to strip_versioned_comments(): process the
+    memory-mapped dump mm[start:end] in READ_CHUNK_SIZE line ranges, passing
+    the output of each to write(). 'in_fd' is the file descriptor of the
+    mapped file.
+
+    If fout is given, ranges which come out unchanged (see is_unchanged_range)
+    are appended to it directly with os.sendfile() instead (Linux only), so
+    write() must write to fout as well.
+
+    Yields the end of each range, for progress reporting.
+    """
+    send = fout is not None and SENDFILE_FILES
+    for range_start, range_end in iter_line_ranges(mm, start, end, READ_CHUNK_SIZE):
+        if (
+            send
+            and not state["in_comment"]
+            and is_unchanged_range(mm, range_start, range_end, no_drop)
+        ):
+            send_range(fout, in_fd, range_start, range_end - range_start)
+        else:
+            strip_versioned_comments(
+                mm, range_start, range_end, state, version_threshold, write
+            )
+        yield range_end
+
+
+# --- Parallel processing of large dumps (--jobs) ------------------------------
+
+# Approximate size of the slice of the dump handled by one worker process.
+PARALLEL_SLICE_SIZE = 64 << 20
+
+# Slices start at a line with a top-level data statement. Should such a line
+# still be inside a versioned comment (e.g. an INSERT in a trigger body), the
+# previous slice ends inside that comment and the next one is redone with the
+# right state, so the result is always the same as with serial processing.
+SLICE_START_RE = re.compile(rb'\n(?:INSERT INTO |UNLOCK TABLES;)')
+
+
+def find_slice_bounds(buf, size, slice_size):
+    # type: (Any, int, int) -> List[Tuple[int, int]]
+    """
+    Split buf[0:size] into slices of roughly slice_size bytes, each of them
+    starting at the beginning of a line. Returns a list of (start, end).
+    """
+    bounds = []
+    start = 0
+    while size - start > slice_size:
+        m = SLICE_START_RE.search(buf, start + slice_size, size)
+        if m is None:
+            break
+        bounds.append((start, m.start() + 1))
+        start = m.start() + 1
+    bounds.append((start, size))
+    return bounds
+
+
+def strip_dump_slice(
+    in_path,
+    part_path,
+    start,
+    end,
+    version_threshold,
+    no_drop,
+    state,
+):
+    # type: (str, str, int, int, int, bool, Dict[str, Any]) -> Dict[str, Any]
+    """
+    Worker for --jobs: strip versioned comments from bytes [start, end) of the
+    input dump, normalize time_zone and, if requested, strip DROP* statements.
+    The result is written to part_path. The input is memory-mapped, so only
+    the output passes through the worker's memory.
+
+    'state' is the comment state at 'start' (see new_comment_state).
+    Returns the comment state at 'end'.
+    """
+    with open(in_path, "rb") as fin, \
+         open(part_path, "wb", buffering=IO_BUFFER_SIZE) as fpart:
+
+        def write_part(chunk):
+            # type: (bytes) -> None
+            fpart.write(normalize_output(chunk, no_drop))
+
+        mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for _ in strip_mapped_dump(
+                mm, fin.fileno(), start, end, state, version_threshold, no_drop,
+                write_part, fpart,
+            ):
+                pass
+        finally:
+            mm.close()
+
+    return state
+
+
+def append_file(fout, path):
+    # type: (Any, str) -> None
+    """Append the content of the file at 'path' to the unbuffered file fout."""
+    with open(path, "rb") as fin:
+        if SENDFILE_FILES:
+            send_range(fout, fin.fileno(), 0, os.fstat(fin.fileno()).st_size)
+        else:
+            shutil.copyfileobj(fin, fout, IO_BUFFER_SIZE)
+
+
+def process_dump_parallel(
+    in_path,
+    out_path,
+    header,
+    version_threshold,
+    no_drop,
+    jobs,
+):
+    # type: (str, str, bytes, int, bool, int) -> None
+    """
+    Process the dump in slices (see find_slice_bounds) on 'jobs' worker
+    processes and concatenate their results in order. Progress is reported
+    as the slices are collected.
+    """
+    total_size = os.path.getsize(in_path)
+    with open(in_path, "rb") as fin:
+        mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            bounds = find_slice_bounds(mm, total_size, PARALLEL_SLICE_SIZE)
+        finally:
+            mm.close()
+
+    # Keep the parts next to the output: same disk, and os.sendfile() can be used.
+    out_dir = os.path.dirname(os.path.abspath(out_path))
+    part_paths = []
+    last_percent_reported = -1.0
+
+    try:
+        for _ in bounds:
+            fd, part_path = tempfile.mkstemp(
+                prefix=os.path.basename(out_path) + ".", suffix=".part", dir=out_dir
+            )
+            os.close(fd)
+            part_paths.append(part_path)
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(
+                    strip_dump_slice, in_path, part_path, start, end,
+                    version_threshold, no_drop, new_comment_state(),
+                )
+                for part_path, (start, end) in zip(part_paths, bounds)
+            ]
+
+            with open(out_path, "wb", buffering=0) as fout:
+                fout.write(header)
+
+                state = None
+                for future, part_path, (start, end) in zip(futures, part_paths, bounds):
+                    slice_state = future.result()
+                    if state is not None and state["in_comment"]:
+                        # The slice actually starts inside a versioned comment:
+                        # redo it, continuing from where the previous slice ended.
+                        slice_state = strip_dump_slice(
+                            in_path, part_path, start, end,
+                            version_threshold, no_drop, state,
+                        )
+                    state = slice_state
+
+                    append_file(fout, part_path)
+                    os.remove(part_path)
+                    last_percent_reported = report_progress(
+                        end,
+                        total_size,
+                        last_percent_reported,
+                    )
+    finally:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+
 # --- Main stream processing ---------------------------------------------------
 
 
+def dump_header(db_name=None):
+    # type: (Optional[str]) -> bytes
+    """Return the header written at the very top of the output dump."""
+    header = (
+        b"-- Dump created with DB migration tools ( "
+        b"https://github.com/utilmind/MySQL-migration-tools )\n"
+    )
+    if db_name:
+        # If a database name is provided, also select it explicitly.
+        return header + "\nUSE `{0}`;\n\n".format(db_name).encode("utf-8")
+    # Just add a blank line separator if no db_name is given.
+    return header + b"\n"
+
+
 def process_dump_stream(
     in_path,
     out_path,
@@ -433,18 +1256,28 @@ def process_dump_stream(
     default_schema=None,
     db_name=None,
     no_drop=False,
+    io_uring=False,
+    async_io=False,
+    jobs=1,
 ):
+    # type: (str, str, int, Optional[Dict[str, Dict[str, Any]]], Optional[str], Optional[str], bool, bool, bool, int) -> None
     """
     Stream-process input dump:
 
     - write a header line and optional USE `db_name`; at the very top
-    - read line by line
-    - for each '/*!<digits>' block, read until its matching '*/'
-      (across multiple lines, with nested '/* ... */' support)
+    - memory-map the input (or read it in large binary chunks),
+      processing complete lines only
+    - for each '/*!<digits>' block, find its matching '*/'
+      (across lines and chunks, with nested '/* ... */' support);
+      the block is streamed through, never collected in memory
     - if version < threshold: unwrap (emit only inner content)
     - else: keep the whole comment as-is
     - optionally enhance CREATE TABLE statements using table_meta
     - optionally strip DROP* statements when no_drop is True
+    - optionally use io_uring for overlapped reads/writes (Linux only),
+      or background threads (async_io, any platform)
+    - optionally process large dumps on several processes (jobs > 1;
+      not combined with table_meta, which has to see the dump in order)
     - write everything to out_path
     - print progress to stderr
     """
@@ -452,7 +1285,6 @@ def process_dump_stream(
         table_meta = {}
 
     total_size = os.path.getsize(in_path)
-    processed_bytes = 0
     last_percent_reported = -1.0
 
     sys.stderr.write(
@@ -460,8 +1292,34 @@ def process_dump_stream(
         "Saving clean dump to '{2}'...\n".format(in_path, total_size, out_path)
     )
 
+    if jobs > 1 and table_meta:
+        sys.stderr.write(
+            "[WARN] --jobs is ignored when table metadata is given: "
+            "CREATE TABLE enhancement has to see the dump in order.\n"
+        )
+        jobs = 1
+
+    if jobs > 1 and total_size > PARALLEL_SLICE_SIZE:
+        if io_uring or async_io:
+            sys.stderr.write(
+                "[WARN] --io-uring/--async-io are ignored with --jobs: "
+                "the workers read memory-mapped slices and write with plain file I/O.\n"
+            )
+        process_dump_parallel(
+            in_path,
+            out_path,
+            dump_header(db_name),
+            version_threshold,
+            no_drop,
+            jobs,
+        )
+        report_progress(total_size, total_size, last_percent_reported)
+        sys.stderr.write(" done.\n")
+        sys.stderr.flush()
+        return
+
     # State for CREATE TABLE enhancement
-    create_state = {
+    create_state = {  # type: Dict[str, Any]
         "current_schema": default_schema,
         "in_create": False,
         "current_table": None,
@@ -470,138 +1328,54 @@ def process_dump_stream(
     }
 
     def write_out(chunk):
+        # type: (bytes) -> None
         """Write chunk to fout, optionally enhancing CREATE TABLE,
         normalizing time_zone and, if requested, stripping DROP* statements."""
         if not chunk:
             return
-        enhanced = enhance_create_table(chunk, create_state, table_meta, default_schema)
-        # Normalize SET time_zone = 'UTC' to SET time_zone = '+00:00'
-        enhanced = replace_utc_time_zone(enhanced)
-
-        if no_drop:
-            # Split into lines (keeping line endings) and drop any line whose first
-            # non-whitespace token is DROP, including versioned comments like
-            # "/*!50001 DROP VIEW ... */".
-            kept_lines = []
-            for line in enhanced.splitlines(True):
-                stripped = line.lstrip()
-                if not stripped:
-                    kept_lines.append(line)
-                    continue
-                if VERSIONED_DROP_STMT_RE.match(stripped):
-                    continue
-                if DROP_STMT_RE.match(stripped):
-                    continue
-                kept_lines.append(line)
-            enhanced = "".join(kept_lines)
-            if not enhanced:
-                return
-
-        fout.write(enhanced)
-
-    with open(in_path, "r", encoding="utf-8", errors="replace") as fin, \
-         open(out_path, "w", encoding="utf-8", errors="replace") as fout:
-
-        fout.write(
-            "-- Dump created with DB migration tools ( "
-            "https://github.com/utilmind/MySQL-migration-tools )\n"
-        )
-
-        if db_name:
-            # If a database name is provided, also select it explicitly.
-            fout.write("\nUSE `{0}`;\n\n".format(db_name))
-        else:
-            # Just add a blank line separator if no db_name is given.
-            fout.write("\n")
-
-        while True:
-            line = fin.readline()
-            if not line:
-                break  # EOF
-
-            processed_bytes += len(line.encode("utf-8", errors="replace"))
-            last_percent_reported = report_progress(
-                processed_bytes,
-                total_size,
-                last_percent_reported,
-            )
-
-            # We may modify 'line' as we consume versioned comments
-            pos = 0
-            while True:
-                idx = line.find("/*!", pos)
-                if idx == -1:
-                    # No more versioned comments in this line/tail
-                    write_out(line[pos:])
-                    break
-
-                # Check that we actually have digits after /*! (versioned comment)
-                j = idx + 3
-                while j < len(line) and line[j].isdigit():
-                    j += 1
-                if j == idx + 3:
-                    # Not a "/*!<digits>" pattern; treat as normal text up to "/*!"
-                    write_out(line[pos:idx + 3])
-                    pos = idx + 3
-                    continue
-
-                # We have '/*!<digits>' starting at idx.
-                # Collect the full comment block (which may span multiple lines).
-                comment = line[idx:]
-
-                while True:
-                    end_pos, digits_end = find_conditional_end(comment)
-                    if end_pos is not None:
-                        break
-
-                    # Need more data (comment not closed yet)
-                    next_line = fin.readline()
-                    if not next_line:
-                        # EOF inside comment - just output what we have and exit
-                        write_out(line[pos:idx])
-                        write_out(comment)
-                        # ensure final progress
-                        last_percent_reported = report_progress(
-                            total_size,
-                            total_size,
-                            last_percent_reported,
-                        )
-                        sys.stderr.write(" done.\n")
-                        sys.stderr.flush()
-                        return
-
-                    processed_bytes += len(next_line.encode("utf-8", errors="replace"))
+        if table_meta:
+            # CREATE TABLE enhancement works on text. "surrogateescape" makes the
+            # round trip lossless even if the dump is not valid UTF-8.
+            chunk = enhance_create_table(
+                chunk.decode("utf-8", "surrogateescape"),
+                create_state, table_meta, default_schema,
+            ).encode("utf-8", "surrogateescape")
+        chunk = normalize_output(chunk, no_drop)
+        if chunk:
+            fout.write(chunk)
+
+    with open_dump_files(in_path, out_path, io_uring, async_io) as (fin, fout):
+
+        fout.write(dump_header(db_name))
+
+        comment_state = new_comment_state()
+
+        mm = map_input(fin)
+        if mm is not None:
+            with mm:
+                for end in strip_mapped_dump(
+                    mm, fin.fileno(), 0, len(mm), comment_state, version_threshold,
+                    no_drop, write_out,
+                    # Ranges which come out unchanged are copied by the kernel.
+                    None if table_meta else fout,
+                ):
                     last_percent_reported = report_progress(
-                        processed_bytes,
+                        end,
                         total_size,
                         last_percent_reported,
                     )
-                    comment += next_line
-
-                # At this point we have a full '/*!<digits> ... */' in 'comment'
-                version_str = comment[3:digits_end]
-                try:
-                    version = int(version_str)
-                except ValueError:
-                    version = 0
-
-                inner = comment[digits_end:end_pos]   # content inside the comment
-                tail = comment[end_pos + 2:]          # what follows after '*/' (could be ';;' etc.)
-
-                # Write everything before the comment from the original 'line'
-                write_out(line[pos:idx])
-
-                # Decide whether to unwrap or keep the comment
-                if version < version_threshold:
-                    # Unwrap: emit only the inner content
-                    write_out(inner)
-                else:
-                    # Keep the whole comment block as-is
-                    write_out(comment[:end_pos + 2])
-
-                # Now we continue processing the tail of the comment
-                line = tail
-                pos = 0
+        else:
+            while True:
+                chunk = fin.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    finish_versioned_comments(comment_state, version_threshold, write_out)
+                    break
+                last_percent_reported = report_progress(
+                    fin.tell(),
+                    total_size,
+                    last_percent_reported,
+                )
+                feed_versioned_comments(comment_state, chunk, version_threshold, write_out)
 
     # Final 100% report and newline
     last_percent_reported = report_progress(total_size, total_size, last_percent_reported)
@@ -610,6 +1384,7 @@ def process_dump_stream(
 
 
 def main():
+    # type: () -> None
     parser = argparse.ArgumentParser(
         description=(
             "Stream-process a MySQL/MariaDB dump: remove versioned compatibility "
@@ -634,6 +1409,41 @@ def main():
             "versioned comments like '/*!50001 DROP ... */'."
         ),
     )
+    parser.add_argument(
+        "--io-uring",
+        action="store_true",
+        dest="io_uring",
+        help=(
+            "Linux only: read and write through io_uring (requires the 'liburing' "
+            "Python package), overlapping disk I/O with processing. Falls back "
+            "to regular buffered I/O when unavailable. Bypasses the memory-mapped "
+            "scan and the sendfile copy of unchanged ranges, so it is not expected "
+            "to beat the default on a local disk."
+        ),
+    )
+    parser.add_argument(
+        "--async-io",
+        action="store_true",
+        dest="async_io",
+        help=(
+            "Read and write on background threads, overlapping disk I/O with "
+            "processing. Works on any platform, e.g. where --io-uring is not "
+            "available. Bypasses the memory-mapped scan and the sendfile copy "
+            "of unchanged ranges, so it is not expected to beat the default "
+            "on a local disk."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        dest="jobs",
+        help=(
+            "Number of worker processes for large dumps (default: 1). "
+            "Ignored when a table metadata TSV is given."
+        ),
+    )
     parser.add_argument(
         "input",
         help="Path to the input SQL dump file.",
@@ -659,13 +1469,16 @@ def main():
     tsv_path = args.tables_meta
     db_name = args.db_name
     no_drop = bool(args.no_drop)
+    io_uring = bool(args.io_uring)
+    async_io = bool(args.async_io)
+    jobs = max(1, args.jobs)
 
     if not os.path.isfile(in_path):
         print("Input file not found: {0}".format(in_path), file=sys.stderr)
         sys.exit(1)
 
-    table_meta = {}
-    default_schema = None
+    table_meta = {}  # type: Dict[str, Dict[str, Any]]
+    default_schema = None  # type: Optional[str]
 
     if tsv_path is not None:
         table_meta, default_schema = load_table_metadata(tsv_path)
@@ -678,8 +1491,49 @@ def main():
         default_schema=default_schema,
         db_name=db_name,
         no_drop=no_drop,
+        io_uring=io_uring,
+        async_io=async_io,
+        jobs=jobs,
     )
 
 
+# Module name of the optional mypyc build (see the module docstring)
+COMPILED_MODULE = "strip_mysql_compatibility_comments"
+
+
+def load_compiled_main():
+    # type: () -> Optional[Callable[[], None]]
+    """
+    Return main() of the mypyc build of this script (see the module docstring),
+    if there is one next to the script and it is not older than the script.
+    Only an extension module counts: a leftover .py copy of the script is ignored.
+    Loaded by path: mypyc cannot compile a module which imports itself.
+    """
+    if not hasattr(importlib.util, "module_from_spec"):
+        return None  # Python older than 3.5, which mypyc does not support anyway
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    spec = importlib.machinery.PathFinder.find_spec(COMPILED_MODULE, [script_dir])
+    if spec is None or spec.origin is None or not isinstance(spec.loader, importlib.machinery.ExtensionFileLoader):
+        return None
+
+    if os.path.getmtime(spec.origin) < os.path.getmtime(__file__):
+        sys.stderr.write(
+            "[WARN] The compiled build {0} is older than the script "
+            "and is not used; rebuild it or delete it.\n".format(spec.origin)
+        )
+        return None
+
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running, so --jobs workers can unpickle its functions by name
+    sys.modules[COMPILED_MODULE] = module
+    spec.loader.exec_module(module)
+    return module.main
+
+
 if __name__ == "__main__":
-    main()
+    compiled_main = load_compiled_main()
+    if compiled_main is not None:
+        compiled_main()
+    else:
+        main()